@@ -8,17 +8,31 @@ import sys
 import json
 import time
 import re
+import fnmatch
+import functools
+import importlib
+import importlib.util
 import logging
-import sqlite3
+import logging.handlers
+import queue
+import atexit
 import argparse
 import shutil
 import subprocess
+import shlex
 import signal
+import socket
 import threading
 from pathlib import Path
-from collections import deque
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
+try:
+    import orjson
+except ImportError:  # 可选依赖，缺失时回退到标准库 json
+    orjson = None
+
 # 添加模块搜索路径
 # 支持直接运行和安装后运行
 _possible_paths = [
@@ -31,25 +45,306 @@ for path in _possible_paths:
             sys.path.insert(0, candidate)
 
 from modules.config_manager import ConfigManager
-from modules.auth_manager import AuthManager
-from modules.crawler import PixivCrawler
-from modules.database import DatabaseManager
-from modules.downloader import DownloadManager
-from modules.bookmark_order_rebuilder import BookmarkOrderRebuilder
+# 爬虫/下载/数据库模块依赖 requests、pixivpy3，延迟到实际需要的命令中导入，
+# 这样 status/log 等命令启动更快，依赖缺失时 repair 命令也能正常运行
+from modules.fs_watcher import DirectoryWatcher, IN_CREATE, IN_DELETE, IN_IGNORED, IN_MODIFY, IN_MOVE_SELF, IN_MOVED_TO
 
 EXIT_OK = 0
 EXIT_ERROR = 1
 EXIT_USAGE = 2
 LOG_PATTERN = "pixiv-backup-*.log"
 INITD_PATH = "/etc/init.d/pixiv-backup"
+UCI_CONFIG_PATH = "/etc/config/pixiv-backup"
+# uci set 后尚未 commit 的改动暂存在这里，uci show 会叠加这些改动
+UCI_DELTA_PATH = "/tmp/.uci/pixiv-backup"
+PIDFILE_PATH = "/var/run/pixiv-backup.pid"
+SYSLOG_SOCKET_PATH = "/dev/log"
+# user.notice，与 logger 默认优先级一致
+SYSLOG_PRIORITY = 13
+RUN_HISTORY_LIMIT = 100
+# 超过两倍上限才压缩一次，稳定状态下大多数运行只追加一行
+RUN_HISTORY_COMPACT_THRESHOLD = RUN_HISTORY_LIMIT * 2
+STATUS_FLUSH_INTERVAL_SECONDS = 0.5
+PROGRESS_QUEUE_SIZE = 16
+STATUS_TERMINAL_PHASES = frozenset({"done", "error", "interrupted", "stopped"})
+# 由 CLI 进程写入 status.json 的字段，守护进程落盘时需从磁盘合并回来
+CLI_STATUS_KEYS = ("last_trigger_at", "last_trigger_source", "last_trigger_status", "last_trigger_detail")
+FORCE_RUN_POLL_SECONDS = 5
+FORCE_RUN_FULL_CHECK_SECONDS = 60
+# IN_MOVE_SELF：data/ 被移走时监听会跟随旧目录，需要重新监听
+FORCE_WATCH_MASK = IN_CREATE | IN_MOVED_TO | IN_MOVE_SELF
+# CLI 端重复触发去重窗口：该时间内写入的 force_run.flag 视为仍待处理
+FORCE_RUN_DEDUP_SECONDS = 2
+DB_MAINTENANCE_EVERY_CYCLES = 6
+TAIL_BLOCK_SIZE = 64 * 1024
+LOG_FOLLOW_RECHECK_SECONDS = 30
+LOG_BUFFER_SIZE = 64 * 1024
+PIP_REPAIR_PACKAGES = {
+    "install_requests": "requests",
+    "install_pixivpy3": "pixivpy3",
+}
 STOP_EVENT = threading.Event()
 
+class _BufferedFileHandler(logging.FileHandler):
+    """日志先按整条记录缓存在内存中，由 _BatchingQueueListener 在队列空闲时统一落盘
+
+    CLI 审计也会追加写入同一天的日志文件，因此每次 write(2) 只包含完整的行，
+    避免用户态缓冲区在行中间截断后与其他进程的写入交错
+    """
+
+    def __init__(self, filename, encoding=None):
+        self._pending = []
+        self._pending_size = 0
+        super().__init__(filename, encoding=encoding)
+
+    def _open(self):
+        # 无缓冲的二进制追加句柄（O_APPEND），每次写入都是由完整记录拼成的一块
+        return open(self.baseFilename, "ab", buffering=0)
+
+    def emit(self, record):
+        try:
+            data = (self.format(record) + self.terminator).encode(self.encoding or "utf-8", self.errors or "strict")
+        except Exception:
+            self.handleError(record)
+            return
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if self._pending_size >= LOG_BUFFER_SIZE:
+            try:
+                self._write_pending()
+            except Exception:
+                self.handleError(record)
+
+    def _write_pending(self):
+        """把缓存的完整记录一次写入文件（调用方需持有 self.lock）"""
+        if not self._pending:
+            return
+        data = b"".join(self._pending)
+        self._pending.clear()
+        self._pending_size = 0
+        if self.stream is None:
+            self.stream = self._open()
+        view = memoryview(data)
+        while view:
+            written = self.stream.write(view)
+            view = view[written:]
+
+    def _write_pending_quietly(self):
+        try:
+            self._write_pending()
+        except Exception as e:
+            # 后台 flush 没有对应的日志记录可交给 handleError，直接提示到 stderr
+            sys.stderr.write(f"写入日志文件失败: {e}\n")
+
+    def flush(self):
+        # emit 后不立即写入，突发日志合并为少量 write 调用
+        pass
+
+    def sync(self):
+        with self.lock:
+            self._write_pending_quietly()
+
+    def close(self):
+        with self.lock:
+            self._write_pending_quietly()
+        super().close()
+
+
+class _BatchingQueueListener(logging.handlers.QueueListener):
+    """日志队列取空时才 flush 缓冲型 handler"""
+
+    def dequeue(self, block):
+        if block and self.queue.empty():
+            for handler in self.handlers:
+                if isinstance(handler, _BufferedFileHandler):
+                    handler.sync()
+        return super().dequeue(block)
+
+
+class _DailyFileHandler(_BufferedFileHandler):
+    """写入 <log_dir>/pixiv-backup-YYYYMMDD.log，守护进程跨过零点后自动切换到新日期的文件"""
+
+    def __init__(self, log_dir, encoding=None):
+        self.log_dir = Path(log_dir)
+        self._rollover_at = 0
+        super().__init__(self._path_for(time.time()), encoding=encoding)
+
+    def _path_for(self, timestamp):
+        t = time.localtime(timestamp)
+        # mktime 会把 tm_mday + 1 规范化到下个月/年，得到次日零点
+        self._rollover_at = time.mktime((t.tm_year, t.tm_mon, t.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+        return self.log_dir / f"pixiv-backup-{t.tm_year:04d}{t.tm_mon:02d}{t.tm_mday:02d}.log"
+
+    def emit(self, record):
+        if record.created >= self._rollover_at:
+            # handle() 已持有 self.lock；旧日期的缓存先写入旧文件，之后按需打开新文件
+            self._write_pending_quietly()
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            self.baseFilename = os.path.abspath(self._path_for(record.created))
+        super().emit(record)
+
+
+# 单轮同步内使用的配置快照，避免在一轮中反复调用 ConfigManager 的 getter
+ConfigSnapshot = namedtuple(
+    "ConfigSnapshot",
+    "user_id download_mode max_downloads restrict "
+    "sync_interval_seconds cooldown_limit_seconds cooldown_error_seconds",
+)
+
+
+def _json_dumps_bytes(obj, indent=False):
+    """序列化为 UTF-8 JSON 字节，优先使用 orjson"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            pass
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _atomic_write_bytes(path, data, fsync=False):
+    """先写临时文件再 os.replace，读取方不会看到写了一半的文件
+
+    fsync=True 时在替换前落盘，断电后也不会留下空文件；高频写入不使用，以免放大闪存写入
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# (秒, 格式化结果)：同一秒内的多次调用直接复用
+_now_str_cache = (0, "")
+
+
+def _now_str():
+    """当前本地时间 YYYY-MM-DD HH:MM:SS（状态写入热路径使用，按秒缓存格式化结果）"""
+    global _now_str_cache
+    sec = int(time.time())
+    cached_sec, cached_str = _now_str_cache
+    if sec == cached_sec:
+        return cached_str
+    t = time.localtime(sec)
+    text = f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
+    _now_str_cache = (sec, text)
+    return text
+
+
+@functools.lru_cache(maxsize=None)
+def _which(command):
+    """缓存 shutil.which 结果，同一进程内只搜索一次 PATH"""
+    return shutil.which(command)
+
+
+@functools.lru_cache(maxsize=None)
+def _initd_script():
+    """服务脚本路径，不存在时返回 None；同一进程内只 stat 一次"""
+    initd = Path(INITD_PATH)
+    return initd if initd.exists() else None
+
+
+def _dump_json_atomic(path, obj, pretty=False):
+    """序列化 JSON 并原子替换目标文件"""
+    _atomic_write_bytes(path, _json_dumps_bytes(obj, indent=pretty))
+
+
+def _json_loads_bytes(data):
+    """解析 UTF-8 JSON 字节，优先使用 orjson"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
+def _file_signature(path):
+    """(inode, mtime_ns, size)，用于判断文件是否被其他进程替换/改写；不存在时返回 None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+# 进程内已确认存在的目录，重复调用时不再 stat/mkdir
+_KNOWN_DIRS = set()
+
+
+def _runtime_dirs(output_dir):
+    """服务运行所需的目录列表"""
+    output_dir = Path(output_dir)
+    return [
+        output_dir / "img",
+        output_dir / "metadata",
+        output_dir / "data" / "cache",
+        output_dir / "data" / "thumbnails",
+        output_dir / "data" / "logs",
+    ]
+
+
+def _ensure_dirs(directories):
+    """创建缺失的目录，返回本次实际新建的目录"""
+    created = []
+    for directory in directories:
+        if directory in _KNOWN_DIRS:
+            continue
+        if not directory.is_dir():
+            directory.mkdir(parents=True, exist_ok=True)
+            created.append(directory)
+        _KNOWN_DIRS.add(directory)
+    return created
+
+
 class PixivBackupService:
     def __init__(self):
         """初始化备份服务"""
         self.config = ConfigManager()
         self.stop_requested = False
+        self._pending_stop_reason = None
+        self._stop_publish_lock = threading.Lock()
+
+        # 输出目录及派生路径在进程内固定，缓存以免每次状态写入都重新拼接
+        self._output_dir = Path(self.config.get_output_dir())
+        self._data_dir = self._output_dir / "data"
+        self._status_path = self._data_dir / "status.json"
+        self._force_flag_path = self._data_dir / "force_run.flag"
+        self._history_path = self._data_dir / "run_history.jsonl"
+        self._history_count_path = self._data_dir / "run_history.count"
+        self._legacy_history_path = self._data_dir / "run_history.json"
+        self._last_run_path = self._data_dir / "last_run.txt"
+        self._log_dir = self._data_dir / "logs"
+
         self.logger = self._setup_logging()
+
+        # 运行状态保存在内存中，由后台线程合并写入 status.json
+        self._status_state = {}
+        # 从磁盘读入旧状态之前不允许落盘，避免初始化失败退出时用空状态覆盖 status.json
+        self._status_seeded = False
+        # 最近一次读写 status.json 时的文件签名，变化说明文件被 CLI 等外部进程改写过
+        self._status_file_sig = None
+        self._status_lock = threading.Lock()
+        self._status_write_lock = threading.Lock()
+        self._status_dirty = threading.Event()
+        self._status_last_written = b""
+        # 爬虫进度回调只入队，由 progress-worker 线程合并处理
+        self._progress_q = queue.Queue(maxsize=PROGRESS_QUEUE_SIZE)
+        # 队列满时合并进来的最新进度，由 progress-worker 在取空队列后处理
+        self._progress_overflow = None
+        self._progress_overflow_lock = threading.Lock()
+
+        # force_run.flag 事件：inotify 监听线程或停止请求会唤醒冷却等待
+        self._force_event = threading.Event()
+        self._force_watcher = None
+        self._force_watcher_started = False
+        self._force_watch_dir_id = None
         
         # 验证必要配置
         if not self.config.validate_required():
@@ -57,6 +352,11 @@ class PixivBackupService:
             sys.exit(1)
             
         # 初始化组件
+        from modules.auth_manager import AuthManager
+        from modules.crawler import PixivCrawler
+        from modules.database import DatabaseManager
+        from modules.downloader import DownloadManager
+
         self.auth_manager = AuthManager(self.config)
         self.database = DatabaseManager(self.config)
         self.downloader = DownloadManager(self.config, stop_checker=self.is_stop_requested)
@@ -71,7 +371,23 @@ class PixivBackupService:
         
         # 创建目录结构
         self._create_directories()
-        existing_recent_errors = self._read_runtime_status().get("recent_errors")
+        # 仅在启动时读取一次旧状态，之后以内存中的状态为准
+        self._status_state = _load_runtime_status(self._status_file())
+        self._status_file_sig = _file_signature(self._status_file())
+        self._status_seeded = True
+        self._status_flusher = threading.Thread(
+            target=self._status_flusher_loop,
+            name="status-flusher",
+            daemon=True,
+        )
+        self._status_flusher.start()
+        self._progress_worker = threading.Thread(
+            target=self._progress_worker_loop,
+            name="progress-worker",
+            daemon=True,
+        )
+        self._progress_worker.start()
+        existing_recent_errors = self._status_state.get("recent_errors")
         existing_recent_errors = self._prune_recent_errors(existing_recent_errors)
         self._write_runtime_status({
             "state": "idle",
@@ -91,19 +407,19 @@ class PixivBackupService:
         handlers = [logging.StreamHandler(sys.stdout)]
         fallback_message = None
 
-        primary_log_dir = Path(self.config.get_output_dir()) / "data" / "logs"
+        primary_log_dir = self._log_dir
         primary_log_file = primary_log_dir / f"pixiv-backup-{datetime.now().strftime('%Y%m%d')}.log"
 
         try:
             primary_log_dir.mkdir(parents=True, exist_ok=True)
-            handlers.insert(0, logging.FileHandler(primary_log_file, encoding='utf-8'))
+            handlers.insert(0, _DailyFileHandler(primary_log_dir, encoding='utf-8'))
         except Exception as primary_error:
             # 回退到 /tmp，避免因权限问题导致服务直接崩溃
             tmp_log_dir = Path("/tmp/pixiv-backup")
             tmp_log_file = tmp_log_dir / f"pixiv-backup-{datetime.now().strftime('%Y%m%d')}.log"
             try:
                 tmp_log_dir.mkdir(parents=True, exist_ok=True)
-                handlers.insert(0, logging.FileHandler(tmp_log_file, encoding='utf-8'))
+                handlers.insert(0, _DailyFileHandler(tmp_log_dir, encoding='utf-8'))
                 fallback_message = (
                     f"主日志文件不可写({primary_log_file}: {primary_error})，"
                     f"已回退到 {tmp_log_file}"
@@ -114,10 +430,22 @@ class PixivBackupService:
                     "将仅输出到 stdout"
                 )
 
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        # 业务线程只负责入队，文件/stdout 写入由 QueueListener 后台线程完成
+        log_queue = queue.Queue(-1)
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setFormatter(logging.Formatter('%(message)s'))
+        self._queue_handler = queue_handler
+        self._log_listener = _BatchingQueueListener(log_queue, *handlers, respect_handler_level=True)
+        self._log_listener.start()
+        atexit.register(self.close)
+
         logging.basicConfig(
             level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=handlers,
+            handlers=[queue_handler],
             force=True,
         )
 
@@ -128,51 +456,100 @@ class PixivBackupService:
         
     def _create_directories(self):
         """创建必要的目录结构"""
-        output_dir = Path(self.config.get_output_dir())
-        
-        directories = [
-            output_dir / "img",
-            output_dir / "metadata",
-            output_dir / "data" / "cache",
-            output_dir / "data" / "thumbnails",
-            output_dir / "data" / "logs",
-        ]
-        
-        for directory in directories:
-            try:
-                directory.mkdir(parents=True, exist_ok=True)
-                self.logger.info(f"创建目录: {directory}")
-            except Exception as e:
-                self.logger.error(f"创建目录失败: {directory} ({e})")
-                raise
+        # 已存在的目录直接跳过，只为实际新建的目录输出一行汇总日志
+        try:
+            created = _ensure_dirs(_runtime_dirs(self._output_dir))
+        except Exception as e:
+            self.logger.error("创建目录失败: %s", e)
+            raise
+        if created:
+            self.logger.info("创建目录: %s", ", ".join(str(d) for d in created))
 
     def _status_file(self):
-        return Path(self.config.get_output_dir()) / "data" / "status.json"
+        return self._status_path
 
     def _force_flag_file(self):
-        return Path(self.config.get_output_dir()) / "data" / "force_run.flag"
+        return self._force_flag_path
 
-    def _read_runtime_status(self):
-        status_file = self._status_file()
-        if not status_file.exists():
-            return {}
-        try:
-            with open(status_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            return {}
-
-    def _write_runtime_status(self, patch):
-        try:
-            current = self._read_runtime_status()
-            current.update(patch)
-            current["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    def close(self):
+        """进程退出前落盘运行状态并排空日志队列（可重复调用）"""
+        if getattr(self, "_closed", False):
+            return
+        self._closed = True
+        if hasattr(self, "_status_seeded"):
+            self.flush_status(indent=True)
+        listener = getattr(self, "_log_listener", None)
+        if listener is not None:
+            self._log_listener = None
+            # 监听线程停止后队列无人消费：先把根 logger 切回直接输出到 stdout，
+            # 之后（如退出流程中的异常）记录的日志不会静默丢失
+            root_logger = logging.getLogger()
+            root_logger.removeHandler(self._queue_handler)
+            for handler in listener.handlers:
+                if not isinstance(handler, _BufferedFileHandler):
+                    root_logger.addHandler(handler)
+            listener.stop()
+            for handler in listener.handlers:
+                if isinstance(handler, _BufferedFileHandler):
+                    # 写出最后一批缓存的记录并关闭文件
+                    handler.close()
+
+    def _status_snapshot(self):
+        with self._status_lock:
+            return dict(self._status_state)
+
+    def _write_runtime_status(self, patch, flush=False):
+        """合并状态到内存，由后台线程落盘；flush=True 或进入终态时立即写入"""
+        with self._status_lock:
+            self._status_state.update(patch)
+            self._status_state["updated_at"] = _now_str()
+        self._status_dirty.set()
+        if flush or patch.get("phase") in STATUS_TERMINAL_PHASES:
+            self.flush_status(indent=True)
+
+    def flush_status(self, indent=False):
+        """把内存中的运行状态原子写入 status.json（后台刷新用紧凑格式，状态切换时缩进输出）"""
+        if not self._status_seeded:
+            return
+        with self._status_write_lock:
+            self._status_dirty.clear()
             status_file = self._status_file()
-            status_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(status_file, 'w', encoding='utf-8') as f:
-                json.dump(current, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            self.logger.warning(f"写入运行状态失败: {e}")
+            self._merge_external_status(status_file)
+            data = _json_dumps_bytes(self._status_snapshot(), indent=indent)
+            if data == self._status_last_written:
+                # 内容与上次落盘完全一致（同一秒内的重复进度），跳过写入
+                return
+            # 状态切换（缩进输出）时才 fsync，后台节流刷新只依赖原子替换
+            try:
+                try:
+                    _atomic_write_bytes(status_file, data, fsync=indent)
+                except FileNotFoundError:
+                    # data 目录在启动时已创建；仅在被外部删除时补建后重试
+                    status_file.parent.mkdir(parents=True, exist_ok=True)
+                    _atomic_write_bytes(status_file, data, fsync=indent)
+                self._status_last_written = data
+                self._status_file_sig = _file_signature(status_file)
+            except Exception as e:
+                self.logger.warning(f"写入运行状态失败: {e}")
+
+    def _merge_external_status(self, status_file):
+        """status.json 被 CLI 改写过时，把 CLI 负责的字段合并回内存状态，避免下次落盘覆盖丢失"""
+        sig = _file_signature(status_file)
+        if sig is None or sig == self._status_file_sig:
+            return
+        self._status_file_sig = sig
+        external = _load_runtime_status(status_file)
+        patch = {key: external[key] for key in CLI_STATUS_KEYS if key in external}
+        if patch:
+            with self._status_lock:
+                self._status_state.update(patch)
+
+    def _status_flusher_loop(self):
+        """后台写盘线程：同一时间窗口内的多次更新只写一次"""
+        while True:
+            self._status_dirty.wait()
+            time.sleep(STATUS_FLUSH_INTERVAL_SECONDS)
+            self.flush_status()
 
     def _safe_int(self, value, default=0):
         try:
@@ -189,7 +566,7 @@ class PixivBackupService:
             return self._safe_int(counts.get("downloaded", 0), 0)
         except Exception as e:
             self.logger.warning(f"读取数据库成功数量失败，回退到status缓存: {e}")
-            cached = self._read_runtime_status()
+            cached = self._status_snapshot()
             return self._safe_int(cached.get("total_processed_all", 0), 0)
 
     def _extract_pid_from_error(self, detail):
@@ -260,7 +637,7 @@ class PixivBackupService:
             fallback_url=item.get("url", ""),
         )
         normalized = {
-            "time": str(item.get("time") or datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            "time": str(item.get("time") or _now_str()),
             "pid": str(parsed.get("pid", "-")),
             "action": str(item.get("action") or "unknown"),
             "url": str(item.get("url") or parsed.get("url") or ""),
@@ -298,11 +675,11 @@ class PixivBackupService:
     def _build_recent_errors(self, action, detail):
         if not detail:
             return None
-        current = self._read_runtime_status()
+        current = self._status_snapshot()
         recent = self._prune_recent_errors(current.get("recent_errors"))
         parsed = self._parse_error_detail(detail)
         entry = {
-            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "time": _now_str(),
             "pid": parsed.get("pid", "-"),
             "action": str(action or "unknown"),
             "url": parsed.get("url", ""),
@@ -322,10 +699,64 @@ class PixivBackupService:
         return ([entry] + kept)[:10]
 
     def _on_progress(self, payload):
+        """爬虫进度回调：只入队，由 progress-worker 线程合并处理；从不阻塞爬虫线程"""
         if not isinstance(payload, dict):
             return
-        current = self._read_runtime_status()
         patch = dict(payload)
+        with self._progress_overflow_lock:
+            if self._progress_overflow is not None:
+                # 已有溢出时后续进度都并入溢出补丁，保证先入队的旧进度先被处理
+                self._progress_overflow.update(patch)
+                return
+            try:
+                self._progress_q.put_nowait(patch)
+            except queue.Full:
+                # 队列满（处理线程被数据库拖慢）时只保留最新状态，不阻塞下载循环
+                self._progress_overflow = patch
+
+    def _take_progress_overflow(self):
+        """队列已取空时取出溢出补丁；队列中仍有更早的进度时留待下一轮"""
+        with self._progress_overflow_lock:
+            if self._progress_overflow is None or not self._progress_q.empty():
+                return None
+            patch = self._progress_overflow
+            self._progress_overflow = None
+            return patch
+
+    def _drain_progress(self, first):
+        """取出队列中已积压的进度，相邻且 last_error 相同的合并为一条"""
+        merged = [first]
+        while True:
+            try:
+                patch = self._progress_q.get_nowait()
+            except queue.Empty:
+                break
+            self._progress_q.task_done()
+            last = merged[-1]
+            if last.get("last_error") == patch.get("last_error"):
+                last.update(patch)
+            else:
+                # 错误变化需要逐条处理（用于最近错误列表），不与前一条合并
+                merged.append(patch)
+        overflow = self._take_progress_overflow()
+        if overflow is not None:
+            merged.append(overflow)
+        return merged
+
+    def _progress_worker_loop(self):
+        while True:
+            first = self._progress_q.get()
+            try:
+                for patch in self._drain_progress(first):
+                    try:
+                        self._apply_progress(patch)
+                    except Exception as e:
+                        self.logger.warning(f"处理进度更新失败: {e}")
+            finally:
+                self._progress_q.task_done()
+
+    def _apply_progress(self, patch):
+        current = self._status_snapshot()
         if "processed_total" in patch:
             run_processed = self._safe_int(patch.get("processed_total"), 0)
             if run_processed < 0:
@@ -350,23 +781,48 @@ class PixivBackupService:
         self._write_runtime_status(patch)
 
     def request_stop(self, reason="external_stop"):
+        self.signal_stop(reason)
+        self.wake_stop_waiters()
+
+    def signal_stop(self, reason="external_stop"):
+        """只设置普通属性，不获取任何锁（可在信号处理函数中调用）
+
+        Event.set() 需要获取 Event 内部的条件锁，主线程在 wait()/clear() 中可能正持有该锁，
+        因此唤醒等待方与写入状态交给 wake_stop_waiters 在普通线程中完成
+        """
         if self.stop_requested:
             return
+        self._pending_stop_reason = reason
         self.stop_requested = True
+
+    def wake_stop_waiters(self):
+        """唤醒等待中的线程并补写 stopping 状态"""
         STOP_EVENT.set()
+        self._force_event.set()
+        self._publish_stop_request()
+
+    def _publish_stop_request(self):
+        with self._stop_publish_lock:
+            reason = self._pending_stop_reason
+            self._pending_stop_reason = None
+        if reason is None:
+            return
         self._write_runtime_status({
             "state": "stopping",
             "phase": "stop_requested",
             "message": "收到停止请求，正在安全停止",
             "stop_requested": True,
             "stop_reason": reason,
-        })
+        }, flush=True)
         try:
             self.logger.info(_event_line("stop_requested", reason=reason))
         except Exception:
             pass
 
     def is_stop_requested(self):
+        if self._pending_stop_reason is not None:
+            # 信号处理函数不能获取状态锁，由首个检查停止标志的线程补写 stopping 状态
+            self._publish_stop_request()
         return self.stop_requested or STOP_EVENT.is_set()
 
     def _consume_force_run_flag(self):
@@ -379,36 +835,142 @@ class PixivBackupService:
             return True
         return False
 
+    def _ensure_force_watcher(self):
+        """首次等待时启动 inotify 监听线程，不可用时返回 False"""
+        if not self._force_watcher_started:
+            self._force_watcher_started = True
+            if not self._arm_force_watcher():
+                self.logger.info("inotify 不可用，force_run.flag 回退为轮询检测")
+            else:
+                threading.Thread(target=self._force_watch_loop, name="force-run-watcher", daemon=True).start()
+        return self._force_watcher is not None
+
+    def _arm_force_watcher(self):
+        directory = self._force_flag_file().parent
+        self._force_watcher = DirectoryWatcher.create(directory, FORCE_WATCH_MASK)
+        self._force_watch_dir_id = self._force_watch_dir_identity()
+        return self._force_watcher is not None
+
+    def _force_watch_dir_identity(self):
+        try:
+            st = self._force_flag_file().parent.stat()
+        except OSError:
+            return None
+        return (st.st_dev, st.st_ino)
+
+    def _force_watch_lost(self, events):
+        """监听的 data/ 是否已被删除、移走或替换
+
+        data/logs 下的日志文件保持打开时，删除目录后内核要到文件关闭才报告 IN_IGNORED，
+        因此每次唤醒（含超时）都再比对一次目录 inode
+        """
+        if any(mask & (IN_IGNORED | IN_MOVE_SELF) for mask, _name in events):
+            return True
+        return self._force_watch_dir_identity() != self._force_watch_dir_id
+
+    def _force_watch_loop(self):
+        flag_name = self._force_flag_file().name
+        while True:
+            watcher = self._force_watcher
+            try:
+                events = watcher.read_events(timeout=FORCE_RUN_FULL_CHECK_SECONDS)
+            except OSError as e:
+                self.logger.warning(f"force_run.flag 监听失败，回退为轮询检测: {e}")
+                watcher.close()
+                self._force_watcher = None
+                self._force_event.set()
+                return
+            if self._force_watch_lost(events):
+                watcher.close()
+                if not self._rearm_force_watcher():
+                    return
+                # 重新监听前可能已有 flag 写入，唤醒等待方检查一次
+                self._force_event.set()
+                continue
+            if any(name == flag_name for _mask, name in events):
+                self._force_event.set()
+
+    def _rearm_force_watcher(self):
+        """data/ 失效后重建目录并重新监听；失败时回退为轮询"""
+        try:
+            self._force_flag_file().parent.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            self.logger.warning(f"重建数据目录失败: {e}")
+        if not self._arm_force_watcher():
+            self.logger.warning("数据目录被删除或移动，无法重新监听 force_run.flag，回退为轮询检测")
+            self._force_event.set()
+            return False
+        self.logger.warning("数据目录被删除或移动，已重新监听 force_run.flag")
+        return True
+
+    def _on_force_run_triggered(self):
+        self.logger.info("检测到立即备份请求，跳过当前等待")
+        self._write_runtime_status({
+            "state": "idle",
+            "phase": "force_triggered",
+            "message": "收到立即备份请求，开始新一轮同步"
+        })
+        return True
+
     def wait_with_force_run(self, wait_seconds):
         """等待冷却/间隔，并支持被 force_run.flag 中断"""
+        if not self._ensure_force_watcher():
+            return self._poll_force_run(wait_seconds)
+
+        deadline = time.monotonic() + int(wait_seconds)
+        while True:
+            if self.is_stop_requested():
+                self.logger.info("检测到停止请求，结束等待")
+                return False
+            if self._consume_force_run_flag():
+                return self._on_force_run_triggered()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if self._force_watcher is None:
+                # 监听线程已退出，剩余时间改为轮询
+                return self._poll_force_run(int(remaining) or 1)
+            self._force_event.wait(timeout=remaining)
+            self._force_event.clear()
+
+    def _poll_force_run(self, wait_seconds):
+        """inotify 不可用时的回退：每 FORCE_RUN_POLL_SECONDS 秒检查一次 force_run.flag"""
         remaining = int(wait_seconds)
+        last_dir_mtime = None
+        since_full_check = 0
         while remaining > 0:
             if self.is_stop_requested():
                 self.logger.info("检测到停止请求，结束等待")
                 return False
-            if self._consume_force_run_flag():
-                self.logger.info("检测到立即备份请求，跳过当前等待")
-                self._write_runtime_status({
-                    "state": "idle",
-                    "phase": "force_triggered",
-                    "message": "收到立即备份请求，开始新一轮同步"
-                })
-                return True
-            step = 1 if remaining > 1 else remaining
-            time.sleep(step)
+            # 目录 mtime 未变化说明没有新建文件，可跳过对 flag 的检查；
+            # 粗粒度时间戳的文件系统（如 FAT）可能漏掉变化，因此定期强制检查一次
+            try:
+                dir_mtime = self._data_dir.stat().st_mtime_ns
+            except OSError:
+                dir_mtime = None
+            if dir_mtime is None or dir_mtime != last_dir_mtime or since_full_check >= FORCE_RUN_FULL_CHECK_SECONDS:
+                last_dir_mtime = dir_mtime
+                since_full_check = 0
+                if self._consume_force_run_flag():
+                    return self._on_force_run_triggered()
+            step = min(remaining, FORCE_RUN_POLL_SECONDS)
+            since_full_check += step
+            self._force_event.wait(timeout=step)
             remaining -= step
         return False
 
-    def _merge_stats(self, base, part):
-        for key in ("success", "failed", "skipped", "total"):
-            base[key] = base.get(key, 0) + int(part.get(key, 0) or 0)
-        base["hit_max_downloads"] = base.get("hit_max_downloads", False) or bool(part.get("hit_max_downloads", False))
-        base["rate_limited"] = base.get("rate_limited", False) or bool(part.get("rate_limited", False))
-        if part.get("last_error"):
-            base["last_error"] = part.get("last_error")
-        return base
-            
-    def run(self, max_download_limit=None, full_scan=False):
+    def _snapshot_config(self):
+        return ConfigSnapshot(
+            user_id=self.config.get_user_id(),
+            download_mode=self.config.get_download_mode(),
+            max_downloads=self.config.get_max_downloads(),
+            restrict=self.config.get_restrict_mode(),
+            sync_interval_seconds=self.config.get_sync_interval_minutes() * 60,
+            cooldown_limit_seconds=self.config.get_cooldown_after_limit_minutes() * 60,
+            cooldown_error_seconds=self.config.get_cooldown_after_error_minutes() * 60,
+        )
+
+    def run(self, max_download_limit=None, full_scan=False, config_snapshot=None):
         """运行备份服务"""
         if self.is_stop_requested():
             self._write_runtime_status({
@@ -417,8 +979,8 @@ class PixivBackupService:
                 "message": "服务已停止",
                 "total_processed_all": self._get_total_processed_from_db(),
                 "stop_requested": True,
-                "stopped_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            })
+                "stopped_at": _now_str(),
+            }, flush=True)
             return {"success": False, "stats": {}, "hit_max_downloads": False, "rate_limited": False, "last_error": "stop_requested"}
         self.logger.info("开始Pixiv备份服务")
         self._write_runtime_status({
@@ -438,7 +1000,7 @@ class PixivBackupService:
         
         try:
             # 记录开始时间
-            start_time = time.time()
+            start_time = time.monotonic()
             
             # 连接到Pixiv API
             self.logger.info("连接到Pixiv API...")
@@ -448,10 +1010,18 @@ class PixivBackupService:
                 return False
                 
             # 根据配置运行不同的下载模式
-            download_mode = self.config.get_download_mode()
-            user_id = self.config.get_user_id()
-            max_per_sync = self.config.get_max_downloads() if max_download_limit is None else int(max_download_limit)
-            stats = self.crawler.sync_with_task_queue(user_id, download_mode, max_per_sync, full_scan=bool(full_scan))
+            snapshot = config_snapshot or self._snapshot_config()
+            max_per_sync = snapshot.max_downloads if max_download_limit is None else int(max_download_limit)
+            try:
+                stats = self.crawler.sync_with_task_queue(
+                    snapshot.user_id,
+                    snapshot.download_mode,
+                    max_per_sync,
+                    full_scan=bool(full_scan),
+                )
+            finally:
+                # 等待已入队的进度处理完，避免旧进度覆盖随后写入的最终状态
+                self._progress_q.join()
             if stats.get("rate_limited"):
                 self.logger.warning("检测到限速/服务异常，结束本轮同步")
             elif stats.get("hit_max_downloads"):
@@ -460,33 +1030,37 @@ class PixivBackupService:
                 self.logger.info("检测到停止请求，本轮提前结束")
                 
             # 计算运行时间
-            elapsed_time = time.time() - start_time
+            elapsed_time = time.monotonic() - start_time
             hours, remainder = divmod(elapsed_time, 3600)
             minutes, seconds = divmod(remainder, 60)
             
             # 输出统计信息
             self.logger.info("=" * 50)
             self.logger.info("备份完成!")
-            self.logger.info(f"运行时间: {int(hours)}小时 {int(minutes)}分钟 {int(seconds)}秒")
-            self.logger.info(f"成功下载: {stats.get('success', 0)} 个作品")
-            self.logger.info(f"跳过已存在: {stats.get('skipped', 0)} 个作品")
-            self.logger.info(f"失败: {stats.get('failed', 0)} 个作品")
-            self.logger.info(f"总计处理: {stats.get('total', 0)} 个作品")
+            s_success = stats.get("success", 0)
+            s_skipped = stats.get("skipped", 0)
+            s_failed = stats.get("failed", 0)
+            s_total = stats.get("total", 0)
+            self.logger.info("运行时间: %d小时 %d分钟 %d秒", hours, minutes, seconds)
+            self.logger.info("成功下载: %s 个作品", s_success)
+            self.logger.info("跳过已存在: %s 个作品", s_skipped)
+            self.logger.info("失败: %s 个作品", s_failed)
+            self.logger.info("总计处理: %s 个作品", s_total)
             self.logger.info("=" * 50)
-            run_processed_total = self._safe_int(stats.get("total", 0), 0)
+            run_processed_total = self._safe_int(s_total, 0)
             total_processed_all = self._get_total_processed_from_db()
             self._write_runtime_status({
                 "state": "idle",
                 "phase": "done",
                 "message": "同步完成",
                 "processed_total": run_processed_total,
-                "success": stats.get("success", 0),
-                "skipped": stats.get("skipped", 0),
-                "failed": stats.get("failed", 0),
+                "success": s_success,
+                "skipped": s_skipped,
+                "failed": s_failed,
                 "hit_max_downloads": stats.get("hit_max_downloads", False),
                 "rate_limited": stats.get("rate_limited", False),
                 "last_error": stats.get("last_error"),
-                "last_run": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "last_run": _now_str(),
                 "stop_requested": stats.get("stop_requested", False),
                 "queue_pending": stats.get("queue_pending", 0),
                 "queue_running": stats.get("queue_running", 0),
@@ -495,10 +1069,10 @@ class PixivBackupService:
                 "queue_permanent_failed": stats.get("queue_permanent_failed", 0),
                 "last_run_processed_total": run_processed_total,
                 "total_processed_all": total_processed_all,
-            })
+            }, flush=True)
             
             # 保存运行记录
-            self._save_run_record(stats, elapsed_time)
+            self._save_run_record(stats, elapsed_time, snapshot)
             
             return {
                 "success": True,
@@ -517,60 +1091,101 @@ class PixivBackupService:
                 "phase": "interrupted",
                 "message": "用户中断",
                 "total_processed_all": self._get_total_processed_from_db(),
-                "stopped_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            })
+                "stopped_at": _now_str(),
+            }, flush=True)
             return {"success": False, "stats": {}, "hit_max_downloads": False, "rate_limited": False, "last_error": "用户中断"}
         except Exception as e:
-            self.logger.error(f"备份过程中发生错误: {str(e)}", exc_info=True)
+            self.logger.error("备份过程中发生错误: %s", e, exc_info=True)
             recent_errors = self._build_recent_errors("run_error", str(e))
             self._write_runtime_status({
                 "state": "idle",
                 "phase": "error",
                 "message": "同步失败",
                 "last_error": str(e),
-                "recent_errors": recent_errors if recent_errors is not None else self._read_runtime_status().get("recent_errors", []),
+                "recent_errors": recent_errors if recent_errors is not None else self._status_snapshot().get("recent_errors", []),
                 "total_processed_all": self._get_total_processed_from_db(),
-            })
+            }, flush=True)
             return {"success": False, "stats": {}, "hit_max_downloads": False, "rate_limited": False, "last_error": str(e)}
             
-    def _save_run_record(self, stats, elapsed_time):
-        """保存运行记录"""
+    def _save_run_record(self, stats, elapsed_time, snapshot=None):
+        """保存运行记录（追加写入 run_history.jsonl）"""
+        snapshot = snapshot or self._snapshot_config()
         record = {
             "timestamp": datetime.now().isoformat(),
             "stats": stats,
             "elapsed_time": elapsed_time,
             "config": {
-                "user_id": self.config.get_user_id(),
-                "download_mode": self.config.get_download_mode(),
-                "restrict": self.config.get_restrict_mode(),
-                "max_downloads": self.config.get_max_downloads()
+                "user_id": snapshot.user_id,
+                "download_mode": snapshot.download_mode,
+                "restrict": snapshot.restrict,
+                "max_downloads": snapshot.max_downloads
             }
         }
         
-        record_file = Path(self.config.get_output_dir()) / "data" / "run_history.json"
-        
-        # 读取历史记录
-        history = []
-        if record_file.exists():
-            try:
-                with open(record_file, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-            except:
-                history = []
-                
-        # 添加新记录（最多保存最近100次）
-        history.append(record)
-        if len(history) > 100:
-            history = history[-100:]
-            
-        # 保存记录
-        with open(record_file, 'w', encoding='utf-8') as f:
-            json.dump(history, f, ensure_ascii=False, indent=2)
+        record_file = self._history_path
+        self._migrate_legacy_run_history(self._legacy_history_path, record_file)
+        count = self._read_run_history_count(record_file)
+
+        # 常规路径只追加一行，不再解析并重写整个历史文件
+        with open(record_file, 'ab') as f:
+            f.write(_json_dumps_bytes(record) + b"\n")
+        count += 1
+
+        # 条数由 run_history.count 记录，只有超过压缩阈值时才读取并截到最近 RUN_HISTORY_LIMIT 条
+        if count > RUN_HISTORY_COMPACT_THRESHOLD:
+            count = self._compact_run_history(record_file)
+        _atomic_write_bytes(self._history_count_path, str(count).encode("ascii"))
             
         # 更新最后运行时间
-        last_run_file = Path(self.config.get_output_dir()) / "data" / "last_run.txt"
-        with open(last_run_file, 'w', encoding='utf-8') as f:
-            f.write(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        _atomic_write_bytes(self._last_run_path, _now_str().encode("ascii"))
+
+    def _read_run_history_count(self, record_file):
+        """读取历史条数；计数文件缺失或损坏时数一次行数"""
+        try:
+            return int(self._history_count_path.read_text(encoding='utf-8').strip())
+        except (OSError, ValueError):
+            pass
+        if not record_file.exists():
+            return 0
+        with open(record_file, 'rb') as f:
+            return sum(1 for _ in f)
+
+    def _compact_run_history(self, record_file):
+        """仅保留最近 RUN_HISTORY_LIMIT 条运行记录（原子替换），返回保留条数"""
+        with open(record_file, 'rb') as f:
+            tail = deque(f, maxlen=RUN_HISTORY_LIMIT)
+        tmp_file = record_file.with_name(record_file.name + ".tmp")
+        with open(tmp_file, 'wb') as f:
+            f.writelines(tail)
+        os.replace(tmp_file, record_file)
+        return len(tail)
+
+    def _migrate_legacy_run_history(self, legacy_file, record_file):
+        """一次性把旧版 run_history.json（JSON 数组）转换为 JSONL"""
+        if not legacy_file.exists():
+            return
+        try:
+            with open(legacy_file, 'rb') as f:
+                history = _json_loads_bytes(f.read())
+        except Exception:
+            history = []
+        if not isinstance(history, list):
+            history = []
+
+        lines = [_json_dumps_bytes(item) + b"\n" for item in history[-RUN_HISTORY_LIMIT:]]
+        if record_file.exists():
+            with open(record_file, 'rb') as f:
+                lines.extend(f)
+        tmp_file = record_file.with_name(record_file.name + ".tmp")
+        with open(tmp_file, 'wb') as f:
+            f.writelines(lines[-RUN_HISTORY_LIMIT:])
+        os.replace(tmp_file, record_file)
+        for stale in (legacy_file, self._history_count_path):
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+        self.logger.info(f"已迁移运行历史: {legacy_file} -> {record_file}")
 
 def main():
     """主函数"""
@@ -642,7 +1257,10 @@ def main():
 
     if args.daemon:
         service = PixivBackupService()
-        _run_daemon_loop(service)
+        try:
+            _run_daemon_loop(service)
+        finally:
+            service.close()
         return EXIT_OK
 
     if args.command == "status":
@@ -727,39 +1345,42 @@ def main():
 def _run_daemon_loop(service):
     """守护进程模式：固定巡检 + 冷却策略"""
     _install_signal_handlers(service)
-    sync_interval_minutes = service.config.get_sync_interval_minutes()
-    cooldown_limit_minutes = service.config.get_cooldown_after_limit_minutes()
-    cooldown_error_minutes = service.config.get_cooldown_after_error_minutes()
+    cycle_count = 0
     while not service.is_stop_requested():
-        service.logger.info(_event_line("daemon_cycle_start", mode=service.config.get_download_mode(), max_downloads=service.config.get_max_downloads()))
-        result = service.run(max_download_limit=service.config.get_max_downloads())
+        snapshot = service._snapshot_config()
+        service.logger.info(_event_line("daemon_cycle_start", mode=snapshot.download_mode, max_downloads=snapshot.max_downloads))
+        result = service.run(max_download_limit=snapshot.max_downloads, config_snapshot=snapshot)
         if service.is_stop_requested():
             break
+        cycle_count += 1
+        if cycle_count % DB_MAINTENANCE_EVERY_CYCLES == 0:
+            # 定期截断 WAL，避免长期运行时 -wal 文件持续增长
+            service.database.run_maintenance()
         now = datetime.now()
 
         if result.get("rate_limited"):
-            base_wait_seconds = cooldown_error_minutes * 60
+            base_wait_seconds = snapshot.cooldown_error_seconds
             reason = "rate_limit_or_server_error"
         elif result.get("hit_max_downloads"):
-            base_wait_seconds = cooldown_limit_minutes * 60
+            base_wait_seconds = snapshot.cooldown_limit_seconds
             reason = "hit_max_downloads"
         else:
-            base_wait_seconds = sync_interval_minutes * 60
+            base_wait_seconds = snapshot.sync_interval_seconds
             reason = "normal_interval"
 
         wait_seconds = base_wait_seconds
-        next_run = now + timedelta(seconds=wait_seconds)
+        next_run_at = (now + timedelta(seconds=wait_seconds)).strftime("%Y-%m-%d %H:%M:%S")
         service._write_runtime_status({
             "state": "cooldown",
             "phase": "waiting",
             "cooldown_reason": reason,
-            "next_run_at": next_run.strftime("%Y-%m-%d %H:%M:%S"),
+            "next_run_at": next_run_at,
             "cooldown_seconds": wait_seconds,
             "base_cooldown_seconds": base_wait_seconds,
-        })
+        }, flush=True)
         service.logger.info(
             f"进入冷却({reason})，等待 {base_wait_seconds}s，"
-            f"下次巡检时间: {next_run.strftime('%Y-%m-%d %H:%M:%S')}"
+            f"下次巡检时间: {next_run_at}"
         )
         service.logger.info(
             _event_line(
@@ -767,7 +1388,7 @@ def _run_daemon_loop(service):
                 reason=reason,
                 base_wait_seconds=base_wait_seconds,
                 wait_seconds=wait_seconds,
-                next_run_at=next_run.strftime("%Y-%m-%d %H:%M:%S"),
+                next_run_at=next_run_at,
             )
         )
         service.wait_with_force_run(wait_seconds)
@@ -778,8 +1399,8 @@ def _run_daemon_loop(service):
         "phase": "stopped",
         "message": "服务已停止",
         "stop_requested": True,
-        "stopped_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-    })
+        "stopped_at": _now_str(),
+    }, flush=True)
     service.logger.info(_event_line("daemon_stopped", reason="signal_or_stop"))
 
 
@@ -788,12 +1409,7 @@ def _print_status():
     config = ConfigManager()
     db_path = config.get_database_path()
     status_file = Path(config.get_output_dir()) / "data" / "status.json"
-    runtime = {}
-    if status_file.exists():
-        try:
-            runtime = json.loads(status_file.read_text(encoding="utf-8"))
-        except Exception:
-            runtime = {}
+    runtime = _load_runtime_status(status_file)
     service_running = _is_service_running()
     print("Pixiv Backup 状态")
     print(f"配置节: {config.main_section}")
@@ -904,124 +1520,205 @@ def _print_status():
 
 
 def _latest_log_file(log_dir):
-    if not log_dir.exists():
-        return None
-    files = list(log_dir.glob(LOG_PATTERN))
-    if not files:
-        return None
+    # 单次 scandir 遍历取 mtime 最大者，不构造列表也不排序
+    best = None
+    best_mtime = -1.0
     try:
-        files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+        with os.scandir(log_dir) as entries:
+            for entry in entries:
+                if not fnmatch.fnmatchcase(entry.name, LOG_PATTERN):
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime
+                except OSError:
+                    continue
+                if mtime > best_mtime:
+                    best, best_mtime = entry.name, mtime
     except OSError:
         return None
-    return files[0]
+    return log_dir / best if best else None
+
+
+def _read_tail_lines(log_file, lines):
+    """从文件末尾按块倒读，只读取最后 lines 行所需的字节"""
+    with open(log_file, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        while pos > 0 and buf.count(b"\n") <= lines:
+            step = min(TAIL_BLOCK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    return buf.splitlines(keepends=True)[-lines:]
+
+
+def _write_stdout_bytes(data):
+    """把 UTF-8 字节原样写入 stdout；stdout 没有二进制 buffer（被包装或重定向为文本流）时才替换解码"""
+    out = getattr(sys.stdout, "buffer", None)
+    if out is None:
+        sys.stdout.write(data.decode("utf-8", errors="replace"))
+        sys.stdout.flush()
+        return
+    sys.stdout.flush()
+    out.write(data)
+    out.flush()
 
 
 def _print_tail_from_file(log_file, lines):
-    buffer = deque(maxlen=lines)
-    with open(log_file, "r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            buffer.append(line)
-    for line in buffer:
-        print(line, end="")
+    # 按行边界截取后直接输出，无需 decode/encode
+    _write_stdout_bytes(b"".join(_read_tail_lines(log_file, lines)))
+
+
+def _wait_for_log_activity(watcher):
+    """等待日志目录变化，返回 inotify 事件列表；None 表示需要全量扫描目录"""
+    if watcher is None:
+        time.sleep(1)
+        return None
+    events = watcher.read_events(timeout=LOG_FOLLOW_RECHECK_SECONDS)
+    if not events:
+        # 超时兜底扫描一次，防止漏掉事件
+        return None
+    return events
+
+
+def _open_log_fd(log_file):
+    """以只读方式打开日志文件并定位到末尾"""
+    fd = os.open(log_file, os.O_RDONLY)
+    os.lseek(fd, 0, os.SEEK_END)
+    return fd
 
 
 def _follow_file_logs(log_dir, log_file):
     current_file = log_file
-    stream = None
+    fd = None
+    pending = b""
     waiting_for_new_file = False
     announced_missing = False
+    check_files = True
+    created_file = None
+    current_deleted = False
+    # 有 inotify 时由目录事件唤醒，否则每秒轮询一次
+    watcher = DirectoryWatcher.create(log_dir, IN_MODIFY | IN_CREATE | IN_MOVED_TO | IN_DELETE)
+
+    def _switch_to(path):
+        nonlocal fd, pending, current_file
+        if fd is not None:
+            os.close(fd)
+        fd = None
+        if pending:
+            # 旧文件末尾不完整的一行也输出，避免切换时丢失
+            _write_stdout_bytes(pending + b"\n")
+            pending = b""
+        current_file = path
+        fd = _open_log_fd(current_file)
 
     try:
-        stream = open(current_file, "r", encoding="utf-8", errors="replace")
-        stream.seek(0, os.SEEK_END)
+        fd = _open_log_fd(current_file)
     except OSError:
-        stream = None
+        fd = None
 
     try:
         while True:
-            if stream is None:
+            if fd is None:
                 latest = _latest_log_file(log_dir)
                 if latest:
-                    current_file = latest
                     try:
-                        stream = open(current_file, "r", encoding="utf-8", errors="replace")
-                        stream.seek(0, os.SEEK_END)
+                        _switch_to(latest)
                         print(f"\n[log] 已切换到新日志文件: {current_file}", flush=True)
                         waiting_for_new_file = False
                         announced_missing = False
                         continue
                     except OSError:
-                        stream = None
+                        fd = None
                 if not announced_missing:
                     print("\n[log] 当前日志文件已删除，等待新日志文件...", flush=True)
                     announced_missing = True
                 waiting_for_new_file = True
-                time.sleep(1)
+                _wait_for_log_activity(watcher)
                 continue
 
-            line = stream.readline()
-            if line:
-                print(line, end="", flush=True)
+            # 按块读取，一次输出所有完整行，减少小读取和逐行解码
+            data = os.read(fd, TAIL_BLOCK_SIZE)
+            if data:
+                chunk = pending + data
+                cut = chunk.rfind(b"\n") + 1
+                pending = chunk[cut:]
+                if cut:
+                    _write_stdout_bytes(chunk[:cut])
                 if waiting_for_new_file:
                     waiting_for_new_file = False
                 continue
 
-            # 检测日志轮转，自动切换到最新文件
-            latest = _latest_log_file(log_dir)
+            # inotify 直接给出新日志文件名；只有轮询模式或超时兜底时才扫描目录
+            latest = _latest_log_file(log_dir) if check_files else created_file
+            created_file = None
             if latest and latest != current_file:
-                stream.close()
-                current_file = latest
-                stream = open(current_file, "r", encoding="utf-8", errors="replace")
-                stream.seek(0, os.SEEK_END)
+                _switch_to(latest)
                 print(f"\n[log] 已切换到新日志文件: {current_file}", flush=True)
                 continue
 
             # 当前日志文件被删除：停止读取旧句柄，等待新文件
-            if not current_file.exists():
+            if current_deleted or (check_files and not current_file.exists()):
+                current_deleted = False
                 try:
-                    stream.close()
-                except Exception:
+                    os.close(fd)
+                except OSError:
                     pass
-                stream = None
+                fd = None
                 continue
 
             # 检测文件被截断，回到文件开头继续追踪
             try:
-                current_size = current_file.stat().st_size
+                current_size = os.fstat(fd).st_size
             except OSError:
                 current_size = 0
-            if stream.tell() > current_size:
-                stream.seek(0)
+            if os.lseek(fd, 0, os.SEEK_CUR) > current_size:
+                os.lseek(fd, 0, os.SEEK_SET)
+                pending = b""
+                continue
 
-            time.sleep(1)
+            events = _wait_for_log_activity(watcher)
+            check_files = events is None
+            for mask, name in events or ():
+                if not fnmatch.fnmatch(name, LOG_PATTERN):
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    created_file = log_dir / name
+                elif mask & IN_DELETE and name == current_file.name:
+                    current_deleted = True
     except KeyboardInterrupt:
         print("\n[log] 已停止日志追踪")
         return EXIT_OK
     finally:
-        if stream is not None:
-            stream.close()
+        if fd is not None:
+            os.close(fd)
+        if watcher is not None:
+            watcher.close()
 
 
 def _print_tail_from_syslog(lines):
     try:
-        result = subprocess.run(
+        proc = subprocess.Popen(
             ["logread", "-e", "pixiv-backup"],
-            capture_output=True,
+            # stderr 直接继承给用户终端：只读 stdout 时管道式 stderr 写满会让双方互相阻塞
+            stdout=subprocess.PIPE,
             text=True,
-            check=False,
+            errors="replace",
         )
     except OSError as e:
         print(f"读取系统日志失败: {e}", file=sys.stderr)
         return EXIT_ERROR
 
-    if result.returncode != 0:
-        err = (result.stderr or "").strip()
-        print(f"读取系统日志失败: {err or 'logread 返回非零状态'}", file=sys.stderr)
+    # 边读边丢弃，只保留最后 lines 行，避免整段 syslog 缓冲在内存里
+    with proc:
+        tail = deque(proc.stdout, maxlen=lines)
+
+    if proc.returncode != 0:
+        print(f"读取系统日志失败: logread 返回非零状态 {proc.returncode}", file=sys.stderr)
         return EXIT_ERROR
 
-    output_lines = result.stdout.splitlines()
-    for line in output_lines[-lines:]:
-        print(line)
+    for line in tail:
+        print(line.rstrip("\n"))
     return EXIT_OK
 
 
@@ -1059,7 +1756,7 @@ def handle_log_command(args):
     config = ConfigManager()
     log_dir = config.get_log_dir()
     latest_file = _latest_log_file(log_dir)
-    has_syslog = shutil.which("logread") is not None
+    has_syslog = _which("logread") is not None
 
     source = "auto"
     if args.file:
@@ -1189,6 +1886,8 @@ def handle_errors_command(args):
         print("参数错误: --limit 必须大于 0", file=sys.stderr)
         return EXIT_USAGE
 
+    from modules.database import DatabaseManager
+
     config = ConfigManager()
     database = DatabaseManager(config)
     records = database.get_unresolved_errors(limit=args.limit)
@@ -1209,7 +1908,7 @@ def handle_errors_command(args):
         })
 
     if args.json:
-        print(json.dumps(payload, ensure_ascii=False, indent=2))
+        _write_stdout_bytes(_json_dumps_bytes(payload, indent=True) + b"\n")
         return EXIT_OK
 
     if not payload:
@@ -1255,6 +1954,9 @@ def handle_bookmark_order_command(args):
         _emit_cli_audit(_event_line("bookmark_order_rebuild_stop_daemon", status="ok"))
 
     try:
+        from modules.auth_manager import AuthManager
+        from modules.bookmark_order_rebuilder import BookmarkOrderRebuilder
+
         auth_manager = AuthManager(config)
         api_client = auth_manager.get_api_client()
     except Exception as e:
@@ -1342,49 +2044,54 @@ def _confirm_repair():
     return choice in ("y", "yes")
 
 
-def _collect_repair_issues(config):
-    issues = []
-
-    # 依赖检查
+def _module_available(name):
+    """判断模块是否可导入，不执行模块初始化代码"""
+    if name in sys.modules:
+        return True
     try:
-        import requests  # noqa: F401
-    except Exception as e:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _check_dependency_issues(config):
+    """依赖检查：只查找模块位置，不实际导入（pip 安装后需刷新查找缓存）"""
+    issues = []
+    importlib.invalidate_caches()
+    if not _module_available("requests"):
         issues.append({
             "id": "missing_requests",
-            "message": f"依赖缺失: requests ({e})",
+            "message": "依赖缺失: requests (未找到模块)",
             "fix_action": "install_requests",
             "fixable": True,
         })
 
-    try:
-        import pixivpy3  # noqa: F401
-    except Exception as e:
+    if not _module_available("pixivpy3"):
         issues.append({
             "id": "missing_pixivpy3",
-            "message": f"依赖缺失: pixivpy3 ({e})",
+            "message": "依赖缺失: pixivpy3 (未找到模块)",
             "fix_action": "install_pixivpy3",
             "fixable": True,
         })
+    return issues
 
-    # 配置检查
-    if not config.validate_required():
-        issues.append({
-            "id": "invalid_required_config",
-            "message": "UCI 必填配置不完整（user_id/refresh_token/output_dir）",
-            "fix_action": None,
-            "fixable": False,
-        })
 
-    # 目录检查
-    output_dir = Path(config.get_output_dir())
-    required_dirs = [
-        output_dir / "img",
-        output_dir / "metadata",
-        output_dir / "data" / "cache",
-        output_dir / "data" / "thumbnails",
-        output_dir / "data" / "logs",
-    ]
-    for d in required_dirs:
+def _check_config_issues(config):
+    """配置检查"""
+    if config.validate_required():
+        return []
+    return [{
+        "id": "invalid_required_config",
+        "message": "UCI 必填配置不完整（user_id/refresh_token/output_dir）",
+        "fix_action": None,
+        "fixable": False,
+    }]
+
+
+def _check_dir_issues(config):
+    """目录检查"""
+    issues = []
+    for d in _runtime_dirs(config.get_output_dir()):
         if not d.exists():
             issues.append({
                 "id": "missing_dir",
@@ -1392,38 +2099,69 @@ def _collect_repair_issues(config):
                 "fix_action": "create_runtime_dirs",
                 "fixable": True,
             })
+    return issues
 
-    # 数据库检查（存在则可读，不存在则可初始化）
+
+def _check_database_issues(config):
+    """数据库检查（存在则可读，不存在则可初始化）"""
     db_path = Path(config.get_database_path())
-    if db_path.exists():
-        try:
-            conn = sqlite3.connect(str(db_path))
-            conn.execute("SELECT 1")
-            conn.close()
-        except Exception as e:
-            issues.append({
-                "id": "db_open_failed",
-                "message": f"数据库无法打开: {db_path} ({e})",
-                "fix_action": "init_database",
-                "fixable": True,
-            })
-    else:
-        issues.append({
+    if not db_path.exists():
+        return [{
             "id": "db_missing",
             "message": f"数据库不存在: {db_path}",
             "fix_action": "init_database",
             "fixable": True,
-        })
+        }]
+    try:
+        # 只读连接探测，不会修改数据库内容；但 WAL 库在守护进程未持有时仍会创建并留下 -wal/-shm。
+        # 不使用 immutable=1：它会忽略守护进程的并发写入，可能把正在写入的库误判为损坏
+        import sqlite3
 
-    return issues
+        conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True, timeout=1.0)
+        try:
+            conn.execute("PRAGMA query_only=1")
+            conn.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        finally:
+            conn.close()
+    except Exception as e:
+        return [{
+            "id": "db_open_failed",
+            "message": f"数据库无法打开: {db_path} ({e})",
+            "fix_action": "init_database",
+            "fixable": True,
+        }]
+    return []
+
+
+REPAIR_CHECKS = (
+    _check_dependency_issues,
+    _check_config_issues,
+    _check_dir_issues,
+    _check_database_issues,
+)
 
 
-def _install_with_pip(package_name):
-    pip3 = shutil.which("pip3")
+def _run_repair_checks(config, checks=REPAIR_CHECKS):
+    """执行检查项并按固定顺序返回 [(check, issues)]"""
+    if not checks:
+        return []
+    # 各项检查互不依赖且以文件系统 I/O 为主，并行执行
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        futures = [(check, executor.submit(check, config)) for check in checks]
+        return [(check, future.result()) for check, future in futures]
+
+
+def _collect_repair_issues(config, checks=REPAIR_CHECKS):
+    return [issue for _, issues in _run_repair_checks(config, checks) for issue in issues]
+
+
+def _install_with_pip(*package_names):
+    """一次 pip3 调用安装全部包，减少 pip 冷启动次数"""
+    pip3 = _which("pip3")
     if not pip3:
         return False, "pip3 不可用"
     result = subprocess.run(
-        [pip3, "install", "--no-cache-dir", package_name],
+        [pip3, "install", "--no-cache-dir", *package_names],
         capture_output=True,
         text=True,
         check=False,
@@ -1431,28 +2169,20 @@ def _install_with_pip(package_name):
     if result.returncode != 0:
         message = (result.stderr or result.stdout or "").strip()
         return False, message or "安装失败"
-    return True, f"已安装 {package_name}"
+    return True, f"已安装 {' '.join(package_names)}"
 
 
 def _apply_repair_action(config, action):
-    if action == "install_pixivpy3":
-        ok, message = _install_with_pip("pixivpy3")
-        return ok, f"pixivpy3: {message}"
-    if action == "install_requests":
-        ok, message = _install_with_pip("requests")
-        return ok, f"requests: {message}"
+    if action in PIP_REPAIR_PACKAGES:
+        package_name = PIP_REPAIR_PACKAGES[action]
+        ok, message = _install_with_pip(package_name)
+        return ok, f"{package_name}: {message}"
     if action == "create_runtime_dirs":
-        output_dir = Path(config.get_output_dir())
-        for d in [
-            output_dir / "img",
-            output_dir / "metadata",
-            output_dir / "data" / "cache",
-            output_dir / "data" / "thumbnails",
-            output_dir / "data" / "logs",
-        ]:
-            d.mkdir(parents=True, exist_ok=True)
+        _ensure_dirs(_runtime_dirs(config.get_output_dir()))
         return True, "已补齐运行目录"
     if action == "init_database":
+        from modules.database import DatabaseManager
+
         DatabaseManager(config)
         return True, "已初始化/迁移数据库结构"
     return False, f"未知修复动作: {action}"
@@ -1473,7 +2203,8 @@ def handle_repair_command(args):
         return EXIT_USAGE
 
     config = ConfigManager()
-    issues = _collect_repair_issues(config)
+    check_results = _run_repair_checks(config)
+    issues = [issue for _, found in check_results for issue in found]
 
     if not issues:
         print("检查完成：未发现问题。")
@@ -1508,14 +2239,31 @@ def handle_repair_command(args):
         return EXIT_ERROR
 
     print("开始执行修复...")
-    for action in actions:
-        ok, message = _apply_repair_action(config, action)
-        flag = "成功" if ok else "失败"
-        print(f"- {flag}: {message}")
-        if not ok:
-            return EXIT_ERROR
+    # 缺失的依赖合并为一次 pip 安装
+    pip_packages = [PIP_REPAIR_PACKAGES[a] for a in actions if a in PIP_REPAIR_PACKAGES]
+    local_actions = [a for a in actions if a not in PIP_REPAIR_PACKAGES]
+    all_ok = True
+    # pip 安装（网络 I/O）与目录/数据库修复互不依赖，放到后台并行；本地动作之间有先后依赖（先建目录再建库），保持串行
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="repair-pip") as executor:
+        pip_future = executor.submit(_install_with_pip, *pip_packages) if pip_packages else None
+        for action in local_actions:
+            ok, message = _apply_repair_action(config, action)
+            flag = "成功" if ok else "失败"
+            print(f"- {flag}: {message}")
+            if not ok:
+                all_ok = False
+                break
+        if pip_future is not None:
+            ok, message = pip_future.result()
+            flag = "成功" if ok else "失败"
+            print(f"- {flag}: {', '.join(pip_packages)}: {message}")
+            all_ok = all_ok and ok
+    if not all_ok:
+        return EXIT_ERROR
 
-    remaining = _collect_repair_issues(config)
+    # 修复动作只会消除问题，复检时跳过修复前已通过的检查项
+    failed_checks = tuple(check for check, found in check_results if found)
+    remaining = _collect_repair_issues(config, failed_checks)
     if remaining:
         print(f"修复后仍有 {len(remaining)} 项问题：", file=sys.stderr)
         for idx, issue in enumerate(remaining, start=1):
@@ -1528,9 +2276,9 @@ def handle_repair_command(args):
 
 
 def _run_initd_command(action):
-    initd = Path(INITD_PATH)
-    if not initd.exists():
-        print(f"服务脚本不存在: {initd}", file=sys.stderr)
+    initd = _initd_script()
+    if initd is None:
+        print(f"服务脚本不存在: {INITD_PATH}", file=sys.stderr)
         return EXIT_ERROR
 
     result = subprocess.run(
@@ -1610,8 +2358,22 @@ def _is_zombie_pid(pid):
     return False
 
 
+def _is_pidfile_process_alive():
+    """通过 procd 写入的 pidfile 与 /proc 快速判断守护进程存活，无法确认时返回 False"""
+    try:
+        pid = int(Path(PIDFILE_PATH).read_text(encoding="utf-8").strip())
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            cmdline = f.read()
+    except (OSError, ValueError):
+        return False
+    # 防止 PID 被复用后误判
+    if b"pixiv-backup" not in cmdline or b"--daemon" not in cmdline:
+        return False
+    return not _is_zombie_pid(pid)
+
+
 def _list_daemon_pids():
-    pgrep = shutil.which("pgrep")
+    pgrep = _which("pgrep")
     if not pgrep:
         return []
     result = subprocess.run(
@@ -1652,18 +2414,32 @@ def _force_kill_daemon_process(pids=None):
             pass
 
     # 兜底：某些环境只有 pkill/killall 命令可用
-    pkill = shutil.which("pkill")
+    pkill = _which("pkill")
     if pkill:
         subprocess.run([pkill, "-9", "-f", "pixiv-backup --daemon"], check=False)
-    killall = shutil.which("killall")
+    killall = _which("killall")
     if killall:
         subprocess.run([killall, "-9", "pixiv-backup"], check=False)
 
 
 def _install_signal_handlers(service):
+    # 信号可能打断持有锁（状态锁或 Event 内部锁）的主线程：处理函数只置位普通属性，
+    # 再通过自管道唤醒中转线程，由它设置 Event、写入状态
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(write_fd, False)
+
+    def _relay():
+        while os.read(read_fd, 64):
+            service.wake_stop_waiters()
+
     def _handler(signum, _frame):
-        reason = f"signal_{signum}"
-        service.request_stop(reason)
+        service.signal_stop(f"signal_{signum}")
+        try:
+            os.write(write_fd, b"\0")
+        except OSError:
+            pass
+
+    threading.Thread(target=_relay, name="signal-relay", daemon=True).start()
     try:
         signal.signal(signal.SIGTERM, _handler)
         signal.signal(signal.SIGINT, _handler)
@@ -1671,25 +2447,120 @@ def _install_signal_handlers(service):
         pass
 
 
+# CLI 进程内 UCI 配置不会变化，缓存查询结果避免重复读取/fork uci
+_UCI_CACHE = {}
+_UCI_SHOW_CACHE = None
+_OUTPUT_DIRS_CACHE = None
+
+
 def _read_uci_value(key):
-    for cmd in ("/sbin/uci", "/bin/uci", "uci"):
+    if key not in _UCI_CACHE:
+        values = _load_uci_pixiv_backup()
+        if values is not None:
+            _UCI_CACHE[key] = values.get(key) or None
+        else:
+            _UCI_CACHE[key] = _query_uci_value(key)
+    return _UCI_CACHE[key]
+
+
+def _parse_uci_config_file(path):
+    """直接解析 UCI 配置文件，返回 {"pixiv-backup.节名.配置项": 值}；文件不可读时抛出 OSError"""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    values = {}
+    section = None
+    type_counts = {}
+    for line in content.splitlines():
         try:
-            result = subprocess.run(
-                [cmd, "-q", "get", key],
-                capture_output=True,
-                text=True,
-                check=False,
-            )
-        except Exception:
+            # UCI 的引号与转义规则与 shell 一致，例如 'it'\''s'
+            tokens = shlex.split(line, comments=True)
+        except ValueError:
             continue
-        if result.returncode == 0:
-            value = (result.stdout or "").strip()
-            if value:
-                return value
+        if not tokens:
+            continue
+        keyword = tokens[0]
+        if keyword == "config" and len(tokens) >= 2:
+            index = type_counts.get(tokens[1], 0)
+            type_counts[tokens[1]] = index + 1
+            # 匿名节与 uci show 一致，使用 @类型[序号] 命名
+            section = tokens[2] if len(tokens) >= 3 else f"@{tokens[1]}[{index}]"
+        elif keyword == "option" and section is not None and len(tokens) >= 3:
+            values[f"pixiv-backup.{section}.{tokens[1]}"] = tokens[2]
+    return values
+
+
+def _load_uci_pixiv_backup():
+    """读取全部 pixiv-backup 配置：优先直接解析配置文件，其次一次 uci show；均失败时返回 None，由调用方逐项查询"""
+    global _UCI_SHOW_CACHE
+    if _UCI_SHOW_CACHE is not None:
+        return _UCI_SHOW_CACHE or None
+    _UCI_SHOW_CACHE = {}
+    # 有未提交的改动时改用 uci show，与守护进程（ConfigManager）看到的配置保持一致
+    if not os.path.exists(UCI_DELTA_PATH):
+        try:
+            _UCI_SHOW_CACHE = _parse_uci_config_file(UCI_CONFIG_PATH)
+        except OSError:
+            pass
+    if _UCI_SHOW_CACHE:
+        return _UCI_SHOW_CACHE
+    uci = _uci_binary()
+    if uci is None:
+        return None
+    try:
+        result = subprocess.run(
+            [uci, "-q", "show", "pixiv-backup"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except Exception:
+        return None
+    if result.returncode == 0:
+        # 格式: pixiv-backup.节名.配置项='值'
+        for line in result.stdout.splitlines():
+            key, sep, value = line.partition("=")
+            if sep and key.count(".") == 2:
+                _UCI_SHOW_CACHE[key.strip()] = value.strip().strip("'")
+    return _UCI_SHOW_CACHE or None
+
+
+def _query_uci_value(key):
+    uci = _uci_binary()
+    if uci is None:
+        return None
+    try:
+        result = subprocess.run(
+            [uci, "-q", "get", key],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except Exception:
+        return None
+    if result.returncode == 0:
+        value = (result.stdout or "").strip()
+        if value:
+            return value
     return None
 
 
+@functools.lru_cache(maxsize=None)
+def _uci_binary():
+    """定位 uci 可执行文件，同一进程内只查找一次，避免逐个路径 fork 失败"""
+    for candidate in ("/sbin/uci", "/bin/uci"):
+        if os.access(candidate, os.X_OK):
+            return candidate
+    return _which("uci")
+
+
 def _resolve_force_run_output_dirs():
+    global _OUTPUT_DIRS_CACHE
+    if _OUTPUT_DIRS_CACHE is None:
+        _OUTPUT_DIRS_CACHE = _collect_force_run_output_dirs()
+    return list(_OUTPUT_DIRS_CACHE)
+
+
+def _collect_force_run_output_dirs():
     candidates = []
     seen = set()
 
@@ -1711,36 +2582,111 @@ def _resolve_force_run_output_dirs():
     return candidates
 
 
+# 审计日志句柄：log_dir -> (日期, 文件对象)，进程退出时统一关闭
+_AUDIT_HANDLES = {}
+
+
+def _close_audit_handles():
+    for _day, handle in _AUDIT_HANDLES.values():
+        try:
+            handle.close()
+        except Exception:
+            pass
+    _AUDIT_HANDLES.clear()
+
+
+def _audit_handle(log_dir, day):
+    """返回当天审计日志的句柄（进程内复用），跨天时关闭旧句柄重新打开
+
+    使用行缓冲：每条审计行立即以一次 write 追加，长时间运行的命令也能实时看到，
+    且不会与守护进程写入同一文件的内容交错或在进程被杀时丢失
+    """
+    cached = _AUDIT_HANDLES.get(log_dir)
+    if cached is not None:
+        if cached[0] == day:
+            return cached[1]
+        cached[1].close()
+    else:
+        if not _AUDIT_HANDLES:
+            atexit.register(_close_audit_handles)
+        _ensure_dirs((log_dir,))
+    handle = open(log_dir / f"pixiv-backup-{day}.log", "a", encoding="utf-8", buffering=1)
+    _AUDIT_HANDLES[log_dir] = (day, handle)
+    return handle
+
+
 def _emit_cli_audit(message):
-    line = f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - pixiv-backup.cli - INFO - {message}"
+    now = _now_str()
+    line = f"{now} - pixiv-backup.cli - INFO - {message}\n"
+    day = now[:10].replace("-", "")
     for output_dir in _resolve_force_run_output_dirs():
         try:
-            log_dir = Path(output_dir) / "data" / "logs"
-            log_dir.mkdir(parents=True, exist_ok=True)
-            log_file = log_dir / f"pixiv-backup-{datetime.now().strftime('%Y%m%d')}.log"
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(line + "\n")
+            _audit_handle(Path(output_dir) / "data" / "logs", day).write(line)
         except Exception:
             pass
+    sock = _syslog_socket()
+    if sock is not None:
+        try:
+            sock.send(f"<{SYSLOG_PRIORITY}>pixiv-backup.cli: {message}".encode("utf-8"))
+            return
+        except OSError:
+            pass
+    logger_path = _which("logger")
+    if logger_path:
+        # fork logger 放到后台线程（单线程保证 syslog 顺序），解释器退出前会等待已提交的任务完成
+        _audit_pool().submit(_send_audit_to_syslog, logger_path, message)
+
+
+# None 表示尚未尝试连接，False 表示 /dev/log 不可用
+_SYSLOG_SOCKET = None
+
+
+def _syslog_socket():
+    """进程内复用的 /dev/log 数据报套接字，直接发送 syslog 行，省去 fork logger"""
+    global _SYSLOG_SOCKET
+    if _SYSLOG_SOCKET is None:
+        sock = None
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.connect(SYSLOG_SOCKET_PATH)
+        except (OSError, AttributeError):
+            if sock is not None:
+                sock.close()
+            _SYSLOG_SOCKET = False
+        else:
+            _SYSLOG_SOCKET = sock
+    return _SYSLOG_SOCKET or None
+
+
+_AUDIT_POOL = None
+
+
+def _audit_pool():
+    global _AUDIT_POOL
+    if _AUDIT_POOL is None:
+        _AUDIT_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cli-audit")
+    return _AUDIT_POOL
+
+
+def _send_audit_to_syslog(logger_path, message):
     try:
-        if shutil.which("logger"):
-            subprocess.run(["logger", "-t", "pixiv-backup.cli", message], check=False)
+        subprocess.run([logger_path, "-t", "pixiv-backup.cli", message], check=False)
     except Exception:
         pass
 
 
 def _sanitize_event_value(value):
-    text = str(value)
-    text = text.replace("\r", " ").replace("\n", " ")
-    text = " ".join(text.split())
+    # str.split() 已按全部空白（含 \r \n \t）切分，一次即可合并为单个空格
+    text = " ".join(str(value).split())
     return text if text else "-"
 
 
 def _event_line(event, **fields):
-    parts = [f"event={_sanitize_event_value(event)}"]
-    for key, value in fields.items():
-        parts.append(f"{_sanitize_event_value(key)}={_sanitize_event_value(value)}")
-    return " ".join(parts)
+    # 字段名均为代码中的字面量，只清洗字段值
+    return " ".join(
+        [f"event={_sanitize_event_value(event)}"]
+        + [f"{key}={_sanitize_event_value(value)}" for key, value in fields.items()]
+    )
 
 
 def _touch_force_run_flag():
@@ -1754,10 +2700,16 @@ def _touch_force_run_flag():
         return False
 
     for output_dir in output_dirs:
-        flag_file = Path(output_dir) / "data" / "force_run.flag"
+        data_dir = Path(output_dir) / "data"
+        flag_file = data_dir / "force_run.flag"
         try:
-            flag_file.parent.mkdir(parents=True, exist_ok=True)
-            flag_file.touch()
+            _ensure_dirs((data_dir,))
+            fd = os.open(flag_file, os.O_WRONLY | os.O_CREAT | os.O_CLOEXEC, 0o644)
+            try:
+                # 旗标已存在时 O_CREAT 不会更新 mtime，去重判断依赖它，需显式刷新
+                os.utime(fd)
+            finally:
+                os.close(fd)
             success_paths.append(str(flag_file))
         except Exception as e:
             errors.append(f"{flag_file}: {e}")
@@ -1776,8 +2728,10 @@ def _touch_force_run_flag():
 
 
 def _is_service_running():
-    initd = Path(INITD_PATH)
-    if not initd.exists():
+    if _is_pidfile_process_alive():
+        return True
+    initd = _initd_script()
+    if initd is None:
         return False
     result = subprocess.run([str(initd), "running"], capture_output=True, text=True, check=False)
     return result.returncode == 0
@@ -1799,11 +2753,15 @@ def _run_single_cycle_with_daemon_pause(count, full_scan=False):
         daemon_paused = True
         _emit_cli_audit(_event_line("run_guard_stop_daemon", status="ok"))
 
+    service = None
     try:
         service = PixivBackupService()
         result = service.run(max_download_limit=count, full_scan=bool(full_scan))
         run_ret = EXIT_OK if result.get("success") else EXIT_ERROR
     finally:
+        # 恢复守护进程前先落盘状态和日志，避免与新进程交错写入
+        if service is not None:
+            service.close()
         if daemon_paused:
             print("恢复后台守护进程 ...")
             start_ret = _run_initd_command("start")
@@ -1816,20 +2774,46 @@ def _run_single_cycle_with_daemon_pause(count, full_scan=False):
     return run_ret
 
 
+# status.json 路径 -> (mtime_ns, size, 解析结果)；文件未变化时跳过重复读取与解析
+_STATUS_CACHE = {}
+
+
+def _load_runtime_status(status_file):
+    """读取 status.json（供 CLI 等外部进程使用），不存在或损坏时返回空字典"""
+    try:
+        st = os.stat(status_file)
+    except OSError:
+        _STATUS_CACHE.pop(status_file, None)
+        return {}
+    cached = _STATUS_CACHE.get(status_file)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return dict(cached[2])
+    try:
+        parsed = _json_loads_bytes(status_file.read_bytes())
+    except Exception:
+        return {}
+    if not isinstance(parsed, dict):
+        return {}
+    _STATUS_CACHE[status_file] = (st.st_mtime_ns, st.st_size, parsed)
+    return dict(parsed)
+
+
 def _write_runtime_status_patch(output_dir, patch):
     status_file = Path(output_dir) / "data" / "status.json"
-    current = {}
-    if status_file.exists():
-        try:
-            with open(status_file, "r", encoding="utf-8") as f:
-                current = json.load(f)
-        except Exception:
-            current = {}
+    previous = _load_runtime_status(status_file)
+    current = dict(previous)
     current.update(patch)
-    current["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    status_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(status_file, "w", encoding="utf-8") as f:
-        json.dump(current, f, ensure_ascii=False, indent=2)
+    current["updated_at"] = _now_str()
+    if current == previous:
+        # 同一秒内重复触发且内容一致时，文件已是最新，无需重写
+        return
+    _ensure_dirs((status_file.parent,))
+    _dump_json_atomic(status_file, current, pretty=True)
+    try:
+        st = os.stat(status_file)
+    except OSError:
+        return
+    _STATUS_CACHE[status_file] = (st.st_mtime_ns, st.st_size, current)
 
 
 def _record_service_stopped_status(source="cli_stop"):
@@ -1838,7 +2822,7 @@ def _record_service_stopped_status(source="cli_stop"):
         "phase": "stopped",
         "message": "服务已停止",
         "stop_requested": True,
-        "stopped_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "stopped_at": _now_str(),
         "cooldown_reason": None,
         "next_run_at": None,
         "cooldown_seconds": 0,
@@ -1853,7 +2837,7 @@ def _record_service_stopped_status(source="cli_stop"):
 
 def _record_trigger_status(source, status, detail):
     patch = {
-        "last_trigger_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "last_trigger_at": _now_str(),
         "last_trigger_source": source,
         "last_trigger_status": status,
         "last_trigger_detail": detail,
@@ -1867,20 +2851,32 @@ def _record_trigger_status(source, status, detail):
 
 def _read_runtime_status_for_trigger():
     for output_dir in _resolve_force_run_output_dirs():
-        status_file = Path(output_dir) / "data" / "status.json"
-        if not status_file.exists():
-            continue
+        parsed = _load_runtime_status(Path(output_dir) / "data" / "status.json")
+        if parsed:
+            return parsed
+    return {}
+
+
+def _recent_force_run_flag(output_dirs):
+    """返回 FORCE_RUN_DEDUP_SECONDS 内刚写入且尚未被服务消费的 force_run.flag，没有时返回 None"""
+    threshold = time.time() - FORCE_RUN_DEDUP_SECONDS
+    for output_dir in output_dirs:
+        flag_file = Path(output_dir) / "data" / "force_run.flag"
         try:
-            with open(status_file, "r", encoding="utf-8") as f:
-                parsed = json.load(f)
-            if isinstance(parsed, dict):
-                return parsed
-        except Exception:
+            if os.stat(flag_file).st_mtime > threshold:
+                return flag_file
+        except OSError:
             continue
-    return {}
+    return None
 
 
 def _trigger_immediate_scan(source):
+    pending_flag = _recent_force_run_flag(_resolve_force_run_output_dirs())
+    if pending_flag is not None:
+        # 短时间内重复触发：上一次的请求仍在等待服务处理，无需重复写入
+        _emit_cli_audit(_event_line("trigger_request", source=source, status="ok", reason="recent_flag"))
+        print(f"已有待处理的立即扫描请求: {pending_flag}")
+        return EXIT_OK
     running = _is_service_running()
     ok = _touch_force_run_flag()
     if ok:
@@ -1892,7 +2888,7 @@ def _trigger_immediate_scan(source):
         _emit_cli_audit(_event_line("trigger_request", source=source, status="ok", service_running=running, state=state, phase=phase))
         if running:
             if state == "cooldown":
-                print("已触发立即扫描请求（当前处于冷却，预计 1-2 秒内中断等待并开始下一轮）")
+                print("已触发立即扫描请求（当前处于冷却，预计数秒内中断等待并开始下一轮）")
             elif state == "syncing":
                 print("已触发立即扫描请求（当前正在同步，本轮结束后将立即开始下一轮）")
             else:
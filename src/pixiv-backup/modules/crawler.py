@@ -12,6 +12,7 @@ class PixivCrawler:
     MAX_ATTEMPTS_PER_ROUND = 3
     INVALID_FAILED_ROUNDS_LIMIT = 2
     BOOKMARK_EXISTING_STREAK_STOP = 10
+    STATS_COUNT_KEYS = ("success", "failed", "skipped", "total")
 
     def __init__(self, config, auth_manager, database, downloader, progress_callback=None, stop_checker=None):
         """初始化爬虫"""
@@ -134,7 +135,7 @@ class PixivCrawler:
         base_seconds = self.low_speed_interval_seconds if self.low_speed_interval_seconds > 0 else 0.0
         jitter_seconds = 0.0
         if self.interval_jitter_ms > 0:
-            jitter_seconds = random.randint(0, int(self.interval_jitter_ms)) / 1000.0
+            jitter_seconds = random.random() * self.interval_jitter_ms * 0.001
         sleep_seconds = base_seconds + jitter_seconds
         if sleep_seconds > 0:
             self._log_event(
@@ -1050,12 +1051,18 @@ class PixivCrawler:
         return stats
 
     def _merge_stats(self, base, part):
-        for key in ("success", "failed", "skipped", "total"):
-            base[key] = base.get(key, 0) + int(part.get(key, 0) or 0)
-        base["hit_max_downloads"] = base.get("hit_max_downloads", False) or bool(part.get("hit_max_downloads", False))
-        base["rate_limited"] = base.get("rate_limited", False) or bool(part.get("rate_limited", False))
-        if part.get("last_error"):
-            base["last_error"] = part.get("last_error")
+        if not part:
+            return base
+        part_get = part.get
+        base_get = base.get
+        for key in self.STATS_COUNT_KEYS:
+            base[key] = base_get(key, 0) + (part_get(key) or 0)
+        base["hit_max_downloads"] = base_get("hit_max_downloads", False) or bool(part_get("hit_max_downloads"))
+        base["rate_limited"] = base_get("rate_limited", False) or bool(part_get("rate_limited"))
+        last_error = part_get("last_error")
+        if last_error:
+            base["last_error"] = last_error
+        return base
 
     def sync_with_task_queue(self, user_id, download_mode, max_downloads, full_scan=False):
         stats = {
@@ -4,6 +4,23 @@ import logging
 from pathlib import Path
 from datetime import datetime
 
+# 每个连接都需要设置的 PRAGMA（journal_mode=WAL 写入库文件持久生效，只在初始化时设置）
+# mmap/cache 按路由器内存规模取值，避免 32 位设备地址空间不足
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-16384",
+    "PRAGMA busy_timeout=5000",
+)
+_CONNECTION_PRAGMA_SCRIPT = ";\n".join(CONNECTION_PRAGMAS) + ";"
+
+
+def configure_connection(conn):
+    """为新连接应用统一的 PRAGMA 设置（一次 executescript 完成）"""
+    conn.executescript(_CONNECTION_PRAGMA_SCRIPT)
+    return conn
+
 
 class DatabaseManager:
     def __init__(self, config):
@@ -15,7 +32,34 @@ class DatabaseManager:
 
     def _connect(self):
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        return sqlite3.connect(str(self.db_path))
+        return configure_connection(sqlite3.connect(str(self.db_path)))
+
+    def _enable_wal(self, conn):
+        """切换到 WAL 日志模式，文件系统不支持时保持原模式"""
+        try:
+            mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()
+        except sqlite3.DatabaseError as e:
+            self.logger.warning("数据库无法启用 WAL 模式，继续使用默认日志模式: %s", e)
+            return
+        if mode and str(mode[0]).lower() != "wal":
+            self.logger.warning("数据库无法启用 WAL 模式，当前日志模式: %s", mode[0])
+
+    def run_maintenance(self):
+        """截断 WAL 文件并刷新查询规划统计，供守护进程周期调用"""
+        def _op():
+            conn = self._connect()
+            try:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                conn.execute("PRAGMA optimize")
+            finally:
+                conn.close()
+            return True
+
+        try:
+            return self._execute_with_recovery(_op, default=False)
+        except Exception as e:
+            self.logger.warning("数据库维护失败: %s", e)
+            return False
 
     def _is_recoverable_db_error(self, error):
         msg = str(error).lower()
@@ -49,6 +93,7 @@ class DatabaseManager:
     def _init_database(self):
         """初始化数据库表结构"""
         conn = self._connect()
+        self._enable_wal(conn)
         cursor = conn.cursor()
 
         # 用户表
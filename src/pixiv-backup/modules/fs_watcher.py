@@ -0,0 +1,82 @@
+import os
+import select
+import struct
+
+try:
+    import ctypes
+except ImportError:  # 部分精简固件未安装 python3-ctypes
+    ctypes = None
+
+IN_MODIFY = 0x00000002
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+# 被监听目录被删除或卸载后，内核自动移除监听并报告该事件
+IN_IGNORED = 0x00008000
+
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+
+class DirectoryWatcher:
+    """基于 inotify 的目录事件监听（仅 Linux），不可用时 create() 返回 None"""
+
+    def __init__(self, fd):
+        self.fd = fd
+
+    @classmethod
+    def create(cls, directory, mask):
+        """监听目录下的指定事件，失败时返回 None 以便调用方回退到轮询"""
+        if ctypes is None:
+            return None
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            inotify_init1 = libc.inotify_init1
+            inotify_add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError):
+            return None
+
+        fd = inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            return None
+        wd = inotify_add_watch(fd, os.fsencode(str(directory)), ctypes.c_uint32(mask))
+        if wd < 0:
+            os.close(fd)
+            return None
+        return cls(fd)
+
+    def fileno(self):
+        return self.fd
+
+    def read_events(self, timeout=None):
+        """等待事件并返回 [(mask, name)]，超时返回空列表"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, _READ_SIZE)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _wd, mask, _cookie, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            raw_name = data[offset:offset + name_len].rstrip(b"\0")
+            offset += name_len
+            events.append((mask, os.fsdecode(raw_name)))
+        return events
+
+    def close(self):
+        if self.fd is None:
+            return
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+        self.fd = None
@@ -0,0 +1,185 @@
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src" / "pixiv-backup"))
+
+import main
+from modules.fs_watcher import DirectoryWatcher, IN_CREATE, IN_IGNORED, IN_MODIFY
+
+
+def local_ts(year, month, day, hour=0, minute=0, second=0):
+    return time.mktime((year, month, day, hour, minute, second, 0, 0, -1))
+
+
+def make_record(message, created):
+    return logging.makeLogRecord({"msg": message, "levelno": logging.INFO, "levelname": "INFO", "created": created})
+
+
+class DailyFileHandlerTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.log_dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def make_handler(self, now):
+        with mock.patch.object(main.time, "time", return_value=now):
+            handler = main._DailyFileHandler(self.log_dir, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.addCleanup(handler.close)
+        return handler
+
+    def read_log(self, day):
+        return (self.log_dir / f"pixiv-backup-{day}.log").read_text(encoding="utf-8")
+
+    def test_rolls_over_to_new_day_file_at_midnight(self):
+        # 跨月的零点，同时验证 mktime 对 tm_mday + 1 的规范化
+        before = local_ts(2024, 1, 31, 23, 59, 58)
+        handler = self.make_handler(before)
+
+        handler.handle(make_record("before midnight", before))
+        handler.handle(make_record("after midnight", local_ts(2024, 2, 1, 0, 0, 1)))
+        handler.close()
+
+        self.assertEqual(self.read_log("20240131"), "before midnight\n")
+        self.assertEqual(self.read_log("20240201"), "after midnight\n")
+
+    def test_same_day_records_stay_in_one_file(self):
+        start = local_ts(2024, 3, 5, 8, 0, 0)
+        handler = self.make_handler(start)
+
+        handler.handle(make_record("first", start))
+        handler.handle(make_record("second", local_ts(2024, 3, 5, 23, 59, 59)))
+        handler.close()
+
+        self.assertEqual(self.read_log("20240305"), "first\nsecond\n")
+        self.assertEqual(sorted(p.name for p in self.log_dir.iterdir()), ["pixiv-backup-20240305.log"])
+
+    def test_records_are_buffered_until_sync(self):
+        now = local_ts(2024, 3, 5, 8, 0, 0)
+        handler = self.make_handler(now)
+
+        handler.handle(make_record("pending", now))
+        self.assertEqual(self.read_log("20240305"), "")
+        handler.sync()
+        self.assertEqual(self.read_log("20240305"), "pending\n")
+
+
+class TailLinesTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.log_file = Path(self._tmp.name) / "pixiv-backup-20240101.log"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, data):
+        self.log_file.write_bytes(data)
+
+    def test_file_smaller_than_block(self):
+        self.write(b"a\nb\nc\n")
+
+        self.assertEqual(main._read_tail_lines(self.log_file, 2), [b"b\n", b"c\n"])
+        self.assertEqual(main._read_tail_lines(self.log_file, 10), [b"a\n", b"b\n", b"c\n"])
+
+    def test_file_larger_than_block(self):
+        lines = [f"line {i:04d}\n".encode("ascii") for i in range(500)]
+        self.write(b"".join(lines))
+
+        with mock.patch.object(main, "TAIL_BLOCK_SIZE", 64):
+            self.assertEqual(main._read_tail_lines(self.log_file, 30), lines[-30:])
+            self.assertEqual(main._read_tail_lines(self.log_file, 1000), lines)
+
+    def test_no_trailing_newline(self):
+        self.write(b"a\nb\nc")
+
+        self.assertEqual(main._read_tail_lines(self.log_file, 2), [b"b\n", b"c"])
+        with mock.patch.object(main, "TAIL_BLOCK_SIZE", 2):
+            self.assertEqual(main._read_tail_lines(self.log_file, 2), [b"b\n", b"c"])
+
+    def test_empty_file(self):
+        self.write(b"")
+
+        self.assertEqual(main._read_tail_lines(self.log_file, 5), [])
+
+    def test_print_tail_writes_raw_bytes(self):
+        self.write("一\n二\n三\n".encode("utf-8"))
+        stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+
+        with mock.patch.object(sys, "stdout", stdout):
+            main._print_tail_from_file(self.log_file, 2)
+
+        self.assertEqual(stdout.buffer.getvalue(), "二\n三\n".encode("utf-8"))
+
+    def test_print_tail_without_binary_stdout(self):
+        self.write(b"ok\n\xff\n")
+        stdout = io.StringIO()
+
+        with mock.patch.object(sys, "stdout", stdout):
+            main._print_tail_from_file(self.log_file, 2)
+
+        self.assertEqual(stdout.getvalue(), "ok\n�\n")
+
+
+class DirectoryWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp.name)
+        self.watcher = DirectoryWatcher.create(self.directory, IN_CREATE | IN_MODIFY)
+        if self.watcher is None:
+            self._tmp.cleanup()
+            self.skipTest("inotify 不可用")
+
+    def tearDown(self):
+        self.watcher.close()
+        self._tmp.cleanup()
+
+    def test_timeout_returns_empty_list(self):
+        self.assertEqual(self.watcher.read_events(timeout=0.05), [])
+
+    def test_reports_create_and_modify_with_names(self):
+        target = self.directory / "force_run.flag"
+        with open(target, "wb") as f:
+            f.write(b"x")
+
+        events = self.watcher.read_events(timeout=1)
+
+        self.assertIn((IN_CREATE, "force_run.flag"), events)
+        self.assertTrue(any(mask & IN_MODIFY and name == "force_run.flag" for mask, name in events))
+
+    def test_ignores_unwatched_events(self):
+        target = self.directory / "existing.log"
+        target.write_bytes(b"")
+        self.watcher.read_events(timeout=1)
+
+        os.utime(target)
+
+        self.assertEqual(self.watcher.read_events(timeout=0.05), [])
+
+    def test_reports_ignored_when_directory_removed(self):
+        subdir = self.directory / "data"
+        subdir.mkdir()
+        watcher = DirectoryWatcher.create(subdir, IN_CREATE)
+        self.addCleanup(watcher.close)
+
+        subdir.rmdir()
+
+        self.assertTrue(any(mask & IN_IGNORED for mask, _name in watcher.read_events(timeout=1)))
+
+    def test_close_is_idempotent(self):
+        self.watcher.close()
+        self.watcher.close()
+        self.assertIsNone(self.watcher.fd)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import json
+import logging
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src" / "pixiv-backup"))
+
+import main
+
+
+def make_service(base_dir):
+    """只初始化运行历史相关字段，不启动真实服务"""
+    service = main.PixivBackupService.__new__(main.PixivBackupService)
+    data_dir = Path(base_dir) / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    service._history_path = data_dir / "run_history.jsonl"
+    service._history_count_path = data_dir / "run_history.count"
+    service._legacy_history_path = data_dir / "run_history.json"
+    service._last_run_path = data_dir / "last_run.txt"
+    service.logger = logging.getLogger("test_run_history")
+    return service
+
+
+SNAPSHOT = main.ConfigSnapshot(
+    user_id="1",
+    download_mode="bookmarks",
+    max_downloads=10,
+    restrict="public",
+    sync_interval_seconds=60,
+    cooldown_limit_seconds=60,
+    cooldown_error_seconds=60,
+)
+
+
+def read_records(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def write_records(path, count, start=0):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(start, start + count):
+            f.write(json.dumps({"stats": {"seq": i}}) + "\n")
+
+
+class RunHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.service = make_service(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def save(self, seq):
+        self.service._save_run_record({"seq": seq}, 1.0, SNAPSHOT)
+
+    def count_file(self):
+        return self.service._history_count_path.read_text(encoding="utf-8").strip()
+
+    def test_append_writes_one_line_per_run(self):
+        for seq in range(3):
+            self.save(seq)
+
+        records = read_records(self.service._history_path)
+        self.assertEqual([r["stats"]["seq"] for r in records], [0, 1, 2])
+        self.assertEqual(records[0]["config"]["user_id"], "1")
+        self.assertEqual(self.count_file(), "3")
+        self.assertTrue(self.service._last_run_path.exists())
+
+    def test_legacy_json_array_is_migrated_to_jsonl(self):
+        legacy = [{"stats": {"seq": i}} for i in range(150)]
+        self.service._legacy_history_path.write_text(json.dumps(legacy), encoding="utf-8")
+        # 旧计数文件与迁移后的行数不符，迁移时应被丢弃并重新计数
+        self.service._history_count_path.write_text("7", encoding="utf-8")
+
+        self.save("new")
+
+        self.assertFalse(self.service._legacy_history_path.exists())
+        records = read_records(self.service._history_path)
+        self.assertEqual(len(records), main.RUN_HISTORY_LIMIT + 1)
+        self.assertEqual(records[0]["stats"]["seq"], 150 - main.RUN_HISTORY_LIMIT)
+        self.assertEqual(records[-1]["stats"]["seq"], "new")
+        self.assertEqual(self.count_file(), str(main.RUN_HISTORY_LIMIT + 1))
+
+    def test_corrupt_legacy_file_is_dropped(self):
+        self.service._legacy_history_path.write_text("{not json", encoding="utf-8")
+
+        self.save(0)
+
+        self.assertFalse(self.service._legacy_history_path.exists())
+        self.assertEqual(len(read_records(self.service._history_path)), 1)
+
+    def test_missing_counter_is_rebuilt_from_lines(self):
+        write_records(self.service._history_path, 5)
+
+        self.save(5)
+
+        self.assertEqual(self.count_file(), "6")
+
+    def test_corrupt_counter_is_rebuilt_from_lines(self):
+        write_records(self.service._history_path, 5)
+        self.service._history_count_path.write_text("abc", encoding="utf-8")
+
+        self.save(5)
+
+        self.assertEqual(self.count_file(), "6")
+
+    def test_no_compaction_at_threshold(self):
+        threshold = main.RUN_HISTORY_COMPACT_THRESHOLD
+        write_records(self.service._history_path, threshold - 1)
+
+        self.save(threshold - 1)
+
+        self.assertEqual(len(read_records(self.service._history_path)), threshold)
+        self.assertEqual(self.count_file(), str(threshold))
+
+    def test_compacts_to_last_limit_past_threshold(self):
+        threshold = main.RUN_HISTORY_COMPACT_THRESHOLD
+        write_records(self.service._history_path, threshold)
+        self.service._history_count_path.write_text(str(threshold), encoding="utf-8")
+
+        self.save(threshold)
+
+        records = read_records(self.service._history_path)
+        self.assertEqual(len(records), main.RUN_HISTORY_LIMIT)
+        self.assertEqual(records[0]["stats"]["seq"], threshold + 1 - main.RUN_HISTORY_LIMIT)
+        self.assertEqual(records[-1]["stats"]["seq"], threshold)
+        self.assertEqual(self.count_file(), str(main.RUN_HISTORY_LIMIT))
+
+
+if __name__ == "__main__":
+    unittest.main()